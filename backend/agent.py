@@ -10,8 +10,12 @@ Core AI agent with:
 - Streaming responses
 """
 
-from typing import List, Generator, Optional, Callable
+from typing import List, AsyncGenerator, Optional, Callable
+import asyncio
 import base64
+import hashlib
+from collections import deque
+import httpx
 from langchain_openai import ChatOpenAI
 from langchain_tavily import TavilySearch
 from langgraph.prebuilt import create_react_agent
@@ -19,15 +23,47 @@ from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
 from config import (
     OPENAI_API_KEY,
-    AVAILABLE_MODELS,
     DEFAULT_MODEL,
+    get_model_config,
     OPENAI_TEMPERATURE,
     TAVILY_API_KEY,
     TAVILY_MAX_RESULTS,
     TAVILY_TOPIC,
-    SYSTEM_PROMPT
+    SYSTEM_PROMPT,
+    MEMORY_BUFFER_SIZE
 )
 from memory import NexusMemory
+from cache import SemanticCache
+
+# Shared HTTP clients — one connection pool per process instead of one per
+# agent, so concurrent sessions reuse TLS connections to api.openai.com
+# and HTTP/2 multiplexes streams on them
+_HTTP_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=50)
+_SHARED_SYNC_CLIENT = httpx.Client(http2=True, limits=_HTTP_LIMITS)
+_SHARED_ASYNC_CLIENT = httpx.AsyncClient(http2=True, limits=_HTTP_LIMITS)
+
+
+async def close_shared_clients():
+    """Close the shared HTTP clients (call on server shutdown)."""
+    _SHARED_SYNC_CLIENT.close()
+    await _SHARED_ASYNC_CLIENT.aclose()
+
+
+# Shared Tavily tool — stateless, so one instance (and one connection
+# pool) serves every agent instead of one per session
+_TAVILY_TOOL = None
+
+
+def _get_tavily_tool() -> TavilySearch:
+    """Get (or lazily create) the shared Tavily search tool."""
+    global _TAVILY_TOOL
+    if _TAVILY_TOOL is None:
+        _TAVILY_TOOL = TavilySearch(
+            max_results=TAVILY_MAX_RESULTS,
+            topic=TAVILY_TOPIC,
+            tavily_api_key=TAVILY_API_KEY
+        )
+    return _TAVILY_TOOL
 
 
 class NexusAgent:
@@ -45,168 +81,242 @@ class NexusAgent:
         """
         self.session_id = session_id
         self.model_name = model_name or DEFAULT_MODEL
-        self.chat_history: List = []
+        # Ring buffer: keep only the last MEMORY_BUFFER_SIZE turns in the
+        # prompt; older context comes back via semantic memory retrieval
+        self.chat_history: deque = deque(maxlen=2 * MEMORY_BUFFER_SIZE)
         self.memory = NexusMemory(session_id=session_id)
+        self.response_cache = SemanticCache(session_id=session_id)
+        self._image_cache: dict = {}
         self.last_tool_used = None
         self.sources = []
         
-        # Get model ID from config
-        model_config = AVAILABLE_MODELS.get(self.model_name, AVAILABLE_MODELS[DEFAULT_MODEL])
+        # Get model ID from config (raises on unknown models)
+        model_config = get_model_config(self.model_name)
         self.model_id = model_config["id"]
         self.supports_vision = model_config["supports_vision"]
         
-        # Initialize LLM
-        self.llm = ChatOpenAI(
-            model=self.model_id,
-            temperature=OPENAI_TEMPERATURE,
-            openai_api_key=OPENAI_API_KEY,
-            streaming=True
-        )
-        
         # Initialize tools
         self.tools = self._create_tools()
-        
-        # Create agent
-        self.agent = create_react_agent(
-            model=self.llm,
-            tools=self.tools,
-            prompt=SYSTEM_PROMPT
-        )
+
+        # Build the LLM + agent for the active model (cached per model)
+        self._agents: dict = {}
+        self.llm, self.agent = self._get_or_create_agent(self.model_name)
     
     def _create_tools(self) -> List:
         """Create available tools."""
-        tavily_search = TavilySearch(
-            max_results=TAVILY_MAX_RESULTS,
-            topic=TAVILY_TOPIC,
-            tavily_api_key=TAVILY_API_KEY
-        )
-        return [tavily_search]
+        return [_get_tavily_tool()]
     
-    def _get_memory_context(self, query: str) -> str:
-        """Get relevant context from memory."""
+    def _get_or_create_agent(self, model_name: str):
+        """
+        Get the (llm, agent) pair for a model, building it only once.
+
+        Graph compilation and LLM construction cost tens of ms each, so
+        toggling between models becomes a dict lookup after first use.
+        """
+        if model_name not in self._agents:
+            model_config = get_model_config(model_name)
+            llm = ChatOpenAI(
+                model=model_config["id"],
+                temperature=OPENAI_TEMPERATURE,
+                openai_api_key=OPENAI_API_KEY,
+                streaming=True,
+                http_client=_SHARED_SYNC_CLIENT,
+                http_async_client=_SHARED_ASYNC_CLIENT
+            )
+            agent = create_react_agent(
+                model=llm,
+                tools=self.tools,
+                prompt=SYSTEM_PROMPT
+            )
+            self._agents[model_name] = (llm, agent)
+        return self._agents[model_name]
+
+    async def _get_memory_context(self, query: str, query_vector=None) -> str:
+        """Get relevant context from memory.
+
+        Both the semantic cache and memory embed with the same model, so
+        the cache-lookup vector is reused for retrieval — one embedding
+        RPC per turn instead of two.
+        """
         try:
-            return self.memory.get_relevant_context(query)
+            return await self.memory.a_get_relevant_context(query, query_vector)
         except Exception as e:
             print(f"Memory error: {e}")
             return ""
     
     def _encode_image(self, image_bytes: bytes) -> str:
-        """Encode image to base64."""
-        return base64.b64encode(image_bytes).decode("utf-8")
+        """
+        Encode image to a base64 data URL, caching by content hash.
+
+        Multi-turn Q&A over the same image reuses the encoded string
+        instead of re-running b64encode on megabytes of pixels per turn.
+        """
+        key = hashlib.blake2b(image_bytes, digest_size=16).digest()
+        data_url = self._image_cache.get(key)
+        if data_url is None:
+            b64 = base64.b64encode(image_bytes).decode("utf-8")
+            data_url = f"data:image/jpeg;base64,{b64}"
+            # Bound the cache — images are large, keep only the newest few
+            if len(self._image_cache) >= 8:
+                self._image_cache.pop(next(iter(self._image_cache)))
+            self._image_cache[key] = data_url
+        return data_url
     
     def change_model(self, model_name: str):
-        """Switch to a different model."""
-        if model_name in AVAILABLE_MODELS:
-            self.model_name = model_name
-            model_config = AVAILABLE_MODELS[model_name]
-            self.model_id = model_config["id"]
-            self.supports_vision = model_config["supports_vision"]
-            
-            # Reinitialize LLM with new model
-            self.llm = ChatOpenAI(
-                model=self.model_id,
-                temperature=OPENAI_TEMPERATURE,
-                openai_api_key=OPENAI_API_KEY,
-                streaming=True
-            )
-            
-            # Recreate agent
-            self.agent = create_react_agent(
-                model=self.llm,
-                tools=self.tools,
-                prompt=SYSTEM_PROMPT
-            )
+        """Switch to a different model (raises ValueError on unknown names)."""
+        model_config = get_model_config(model_name)
+        self.model_name = model_name
+        self.model_id = model_config["id"]
+        self.supports_vision = model_config["supports_vision"]
+
+        # Reuse the cached LLM + agent for this model
+        self.llm, self.agent = self._get_or_create_agent(model_name)
     
-    def chat(self, user_message: str, image_bytes: Optional[bytes] = None) -> str:
+    async def chat(
+        self,
+        user_message: str,
+        image_bytes: Optional[bytes] = None,
+        no_cache: bool = False,
+        history: Optional[List] = None
+    ) -> str:
         """
         Send a message and get response.
-        
+
+        Async so the event loop stays free during the OpenAI round trip;
+        blocking memory/cache calls are offloaded to a thread.
+
         Args:
             user_message: User's text input
             image_bytes: Optional image data
-            
+            no_cache: Skip the semantic response cache (sensitive prompts)
+            history: Optional history snapshot to prompt against. Pass
+                one for concurrent fan-out calls: each call reads the
+                snapshot and leaves chat_history untouched, so
+                interleaved completions can't garble the shared ordering
+
         Returns:
             AI response string
         """
         try:
             self.last_tool_used = None
             self.sources = []
-            
-            # Get memory context
-            memory_context = self._get_memory_context(user_message)
-            
+
+            # Embed the query once and reuse the vector for cache lookup
+            # and cache insertion
+            query_vector = None
+            if not no_cache and not image_bytes:
+                query_vector = await asyncio.to_thread(self.response_cache.embed, user_message)
+                cached = await asyncio.to_thread(self.response_cache.get, user_message, query_vector)
+                if cached is not None:
+                    if history is None:
+                        self.chat_history.append(HumanMessage(content=user_message))
+                        self.chat_history.append(AIMessage(content=cached))
+                    return cached
+
+            # Get memory context (reusing the cache-lookup embedding)
+            memory_context = await self._get_memory_context(user_message, query_vector)
+
             # Prepare input
             if memory_context:
                 enhanced_input = f"{memory_context}\n\nCurrent query: {user_message}"
             else:
                 enhanced_input = user_message
-            
+
+            base_history = list(self.chat_history) if history is None else list(history)
+
             # Handle image if provided and model supports vision
             if image_bytes and self.supports_vision:
-                image_b64 = self._encode_image(image_bytes)
+                image_url = self._encode_image(image_bytes)
                 content = [
                     {"type": "text", "text": enhanced_input},
-                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_b64}"}}
+                    {"type": "image_url", "image_url": {"url": image_url}}
                 ]
-                messages = self.chat_history + [HumanMessage(content=content)]
+                messages = base_history + [HumanMessage(content=content)]
             else:
-                messages = self.chat_history + [HumanMessage(content=enhanced_input)]
-            
+                messages = base_history + [HumanMessage(content=enhanced_input)]
+
             # Invoke agent
-            response = self.agent.invoke({"messages": messages})
+            response = await self.agent.ainvoke({"messages": messages})
             
-            # Extract response
+            # Extract response — the react agent always ends on the final
+            # AIMessage, so index directly instead of scanning the history
+            msgs = response.get("messages", [])
             ai_response = ""
-            if "messages" in response:
-                for msg in reversed(response["messages"]):
-                    if isinstance(msg, AIMessage) and msg.content:
-                        ai_response = msg.content
-                        break
-                    if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                        self.last_tool_used = "web_search"
+            if msgs and isinstance(msgs[-1], AIMessage) and msgs[-1].content:
+                ai_response = msgs[-1].content
+
+            # Tool calls (if any) sit just before the final answer
+            for msg in msgs[-3:]:
+                if hasattr(msg, 'tool_calls') and msg.tool_calls:
+                    self.last_tool_used = "web_search"
             
             if not ai_response:
                 ai_response = "I couldn't generate a response. Please try again."
             
-            # Update history
-            self.chat_history.append(HumanMessage(content=user_message))
-            self.chat_history.append(AIMessage(content=ai_response))
-            
+            # Update history (snapshot callers keep the shared history
+            # untouched — their exchanges still land in vector memory)
+            if history is None:
+                self.chat_history.append(HumanMessage(content=user_message))
+                self.chat_history.append(AIMessage(content=ai_response))
+
             # Store in memory
-            self.memory.add_message("user", user_message)
-            self.memory.add_message("assistant", ai_response)
-            
+            await self.memory.a_add_message("user", user_message)
+            await self.memory.a_add_message("assistant", ai_response)
+
+            # Cache the response (skip images and search results — stale risk)
+            if not no_cache and not image_bytes and not self.was_search_used():
+                await asyncio.to_thread(
+                    self.response_cache.put, user_message, ai_response, query_vector
+                )
+
             return ai_response
             
         except Exception as e:
             return f"Error: {str(e)}"
     
-    def chat_stream(
-        self, 
-        user_message: str, 
+    async def chat_stream(
+        self,
+        user_message: str,
         image_bytes: Optional[bytes] = None,
         on_tool_start: Optional[Callable] = None,
-        on_tool_end: Optional[Callable] = None
-    ) -> Generator[str, None, None]:
+        on_tool_end: Optional[Callable] = None,
+        no_cache: bool = False
+    ) -> AsyncGenerator[str, None]:
         """
-        Stream response word by word.
-        
+        Stream response token by token as the LLM generates it.
+
+        Async so concurrent streams share the event loop instead of
+        blocking a worker each.
+
         Args:
             user_message: User's text input
             image_bytes: Optional image data
             on_tool_start: Callback when tool starts
             on_tool_end: Callback when tool ends
-            
+            no_cache: Skip the semantic response cache (sensitive prompts)
+
         Yields:
             Response chunks
         """
         try:
             self.last_tool_used = None
             self.sources = []
-            
-            # Get memory context
-            memory_context = self._get_memory_context(user_message)
-            
+
+            # Embed the query once and reuse the vector for cache lookup
+            # and cache insertion
+            query_vector = None
+            if not no_cache and not image_bytes:
+                query_vector = await asyncio.to_thread(self.response_cache.embed, user_message)
+                cached = await asyncio.to_thread(self.response_cache.get, user_message, query_vector)
+                if cached is not None:
+                    self.chat_history.append(HumanMessage(content=user_message))
+                    self.chat_history.append(AIMessage(content=cached))
+                    yield cached
+                    return
+
+            # Get memory context (reusing the cache-lookup embedding)
+            memory_context = await self._get_memory_context(user_message, query_vector)
+
             # Prepare input
             if memory_context:
                 enhanced_input = f"{memory_context}\n\nCurrent query: {user_message}"
@@ -215,54 +325,60 @@ class NexusAgent:
             
             # Handle image
             if image_bytes and self.supports_vision:
-                image_b64 = self._encode_image(image_bytes)
+                image_url = self._encode_image(image_bytes)
                 content = [
                     {"type": "text", "text": enhanced_input},
-                    {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_b64}"}}
+                    {"type": "image_url", "image_url": {"url": image_url}}
                 ]
-                messages = self.chat_history + [HumanMessage(content=content)]
+                messages = list(self.chat_history) + [HumanMessage(content=content)]
             else:
-                messages = self.chat_history + [HumanMessage(content=enhanced_input)]
-            
-            full_response = ""
+                messages = list(self.chat_history) + [HumanMessage(content=enhanced_input)]
             
-            # Stream response
-            for chunk in self.agent.stream({"messages": messages}):
+            # Accumulate chunks in a list — += on str is O(n^2) over a
+            # long stream
+            parts: List[str] = []
+
+            # Stream per-token message chunks straight from the LLM, so the
+            # first words reach the client without waiting for the full
+            # completion
+            async for token, metadata in self.agent.astream(
+                {"messages": messages}, stream_mode="messages"
+            ):
                 # Check for tool usage
-                if "agent" in chunk:
-                    for msg in chunk["agent"].get("messages", []):
-                        if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                            self.last_tool_used = "web_search"
-                            if on_tool_start:
-                                on_tool_start("Searching the web...")
-                
+                if getattr(token, 'tool_call_chunks', None):
+                    if self.last_tool_used is None:
+                        self.last_tool_used = "web_search"
+                        if on_tool_start:
+                            on_tool_start("Searching the web...")
+                    continue
+
                 # Check for tool response
-                if "tools" in chunk:
+                if metadata.get("langgraph_node") == "tools":
                     if on_tool_end:
                         on_tool_end()
-                
-                # Extract content
-                if "agent" in chunk:
-                    for msg in chunk["agent"].get("messages", []):
-                        if isinstance(msg, AIMessage) and msg.content:
-                            content = msg.content
-                            full_response += content
-                            # Yield word by word
-                            words = content.split(' ')
-                            for i, word in enumerate(words):
-                                if i < len(words) - 1:
-                                    yield word + ' '
-                                else:
-                                    yield word
+                    continue
+
+                # Yield model tokens as they arrive
+                if isinstance(token, AIMessage) and token.content:
+                    parts.append(token.content)
+                    yield token.content
+
+            full_response = "".join(parts)
             
             # Update history
             self.chat_history.append(HumanMessage(content=user_message))
             self.chat_history.append(AIMessage(content=full_response))
             
             # Store in memory
-            self.memory.add_message("user", user_message)
-            self.memory.add_message("assistant", full_response)
-            
+            await self.memory.a_add_message("user", user_message)
+            await self.memory.a_add_message("assistant", full_response)
+
+            # Cache the response (skip images and search results — stale risk)
+            if not no_cache and not image_bytes and not self.was_search_used() and full_response:
+                await asyncio.to_thread(
+                    self.response_cache.put, user_message, full_response, query_vector
+                )
+
         except Exception as e:
             yield f"Error: {str(e)}"
     
@@ -272,7 +388,8 @@ class NexusAgent:
     
     def clear_history(self):
         """Clear conversation history."""
-        self.chat_history = []
+        self.chat_history.clear()
+        self.response_cache.clear()
         self.memory.clear_session()
     
     def get_history(self) -> List[dict]:
@@ -0,0 +1,222 @@
+"""
+cache.py - NexusAI Semantic Response Cache
+
+This module handles:
+1. Embedding user queries for similarity comparison
+2. Caching (embedding, response) pairs per session
+3. Short-circuiting the LLM call when a query is a close paraphrase
+   of an earlier one
+
+On a cache hit the agent skips the OpenAI round trip entirely, so a
+repeated or paraphrased question returns in microseconds instead of
+seconds.
+"""
+
+import functools
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from config import (
+    OPENAI_API_KEY,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    EMBED_CACHE_SIZE
+)
+
+# Similarity kernel: with Numba installed, a fused JIT loop computes all
+# dot products in one SIMD pass with no temporaries and without fighting
+# the BLAS threadpool under concurrent workers. Plain NumPy matmul is
+# the fallback — Numba stays an optional dependency.
+try:
+    from numba import njit, prange
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _similarity_scores(matrix, q):
+        n, dim = matrix.shape
+        out = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            acc = np.float32(0.0)
+            for j in range(dim):
+                acc += matrix[i, j] * q[j]
+            out[i] = acc
+        return out
+
+except ImportError:
+    def _similarity_scores(matrix, q):
+        return matrix @ q
+
+
+# Shared embeddings client — one per process, not per session
+_EMBEDDINGS = None
+
+
+def _get_embeddings():
+    """Get (or lazily create) the shared embeddings client."""
+    global _EMBEDDINGS
+    if _EMBEDDINGS is None:
+        from langchain_openai import OpenAIEmbeddings
+        _EMBEDDINGS = OpenAIEmbeddings(
+            openai_api_key=OPENAI_API_KEY,
+            model="text-embedding-3-small"
+        )
+    return _EMBEDDINGS
+
+
+@functools.lru_cache(maxsize=EMBED_CACHE_SIZE)
+def _embed_cached(text: str) -> Tuple[float, ...]:
+    """
+    Embed a normalized string, caching the result.
+
+    Identical strings (retries, repeated short queries) reuse the
+    stored vector instead of paying another embedding round trip.
+    Failures raise and are therefore never cached.
+    """
+    return tuple(_get_embeddings().embed_query(text))
+
+
+class SemanticCache:
+    """
+    In-process semantic cache of (query embedding, response) pairs.
+
+    Lookups embed the incoming query and compare it against stored
+    entries by cosine similarity; anything at or above the threshold
+    counts as a hit. Entries carry a timestamp and expire after a TTL
+    so stale answers don't linger.
+
+    Uses the same lazy initialization pattern as NexusMemory so a
+    missing API key degrades to a no-op instead of blocking the agent.
+    """
+
+    def __init__(
+        self,
+        session_id: str = "default",
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl: float = SEMANTIC_CACHE_TTL,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            session_id: Unique identifier for this conversation session
+            threshold: Minimum cosine similarity for a cache hit
+            ttl: Seconds before an entry is considered stale
+            max_entries: Maximum entries kept per session
+        """
+        self.session_id = session_id
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.embeddings = None
+        self._entries: List[Tuple[np.ndarray, str, float]] = []
+        self._initialized = False
+        self._initialization_failed = False
+
+    def initialize(self) -> bool:
+        """
+        Initialize the embeddings client (lazy, only on first use).
+
+        Returns:
+            bool: True if initialization successful
+        """
+        if self._initialization_failed:
+            return False
+
+        if self._initialized:
+            return True
+
+        try:
+            self.embeddings = _get_embeddings()
+            self._initialized = True
+            return True
+
+        except Exception as e:
+            self._initialization_failed = True
+            print(f"Error initializing semantic cache: {e}")
+            return False
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """
+        Embed text into a normalized vector, or None on failure.
+
+        Args:
+            text: The text to embed
+
+        Returns:
+            L2-normalized embedding vector, or None
+        """
+        if not self.initialize():
+            return None
+
+        try:
+            # Normalize so paraphrase-identical strings share a cache slot
+            vec = np.asarray(_embed_cached(text.strip().lower()), dtype=np.float32)
+            norm = np.linalg.norm(vec)
+            if norm > 0:
+                vec /= norm
+            return vec
+        except Exception as e:
+            print(f"Error embedding query for cache: {e}")
+            return None
+
+    def get(self, query: str, query_vector: Optional[np.ndarray] = None) -> Optional[str]:
+        """
+        Look up a cached response for a semantically similar query.
+
+        Args:
+            query: The user's query
+            query_vector: Optional precomputed normalized embedding
+
+        Returns:
+            The cached response, or None on a miss
+        """
+        if not self._entries:
+            return None
+
+        if query_vector is None:
+            query_vector = self.embed(query)
+        if query_vector is None:
+            return None
+
+        # Drop expired entries before scoring
+        now = time.time()
+        self._entries = [e for e in self._entries if now - e[2] < self.ttl]
+        if not self._entries:
+            return None
+
+        # Cosine similarity against all stored (normalized) embeddings
+        matrix = np.stack([e[0] for e in self._entries])
+        scores = _similarity_scores(matrix, query_vector)
+        best = int(np.argmax(scores))
+
+        if scores[best] >= self.threshold:
+            return self._entries[best][1]
+
+        return None
+
+    def put(self, query: str, response: str, query_vector: Optional[np.ndarray] = None):
+        """
+        Store a (query embedding, response) pair.
+
+        Args:
+            query: The user's query
+            response: The response to cache
+            query_vector: Optional precomputed normalized embedding
+        """
+        if query_vector is None:
+            query_vector = self.embed(query)
+        if query_vector is None:
+            return
+
+        self._entries.append((query_vector, response, time.time()))
+
+        # Bound memory: evict oldest entries first
+        if len(self._entries) > self.max_entries:
+            self._entries = self._entries[-self.max_entries:]
+
+    def clear(self):
+        """Clear all cached entries."""
+        self._entries = []
@@ -6,6 +6,7 @@ Central configuration for all settings, models, and prompts.
 """
 
 import os
+import types
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -25,7 +26,9 @@ PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
 # AVAILABLE MODELS (Dynamic Selection)
 # =============================================================================
 
-AVAILABLE_MODELS = {
+# Frozen after definition: immutable shared structures stay copy-on-write
+# friendly across forked workers and can't be mutated by accident
+_AVAILABLE_MODELS = {
     "GPT-4o-mini": {
         "id": "gpt-4o-mini",
         "description": "Fast & efficient",
@@ -48,13 +51,29 @@ AVAILABLE_MODELS = {
     }
 }
 
+AVAILABLE_MODELS = types.MappingProxyType(_AVAILABLE_MODELS)
+
 DEFAULT_MODEL = "GPT-4o-mini"
 
+
+def get_model_config(model_name: str) -> dict:
+    """
+    Look up a model's configuration.
+
+    Raises ValueError on unknown names instead of silently falling back,
+    so a bad model id surfaces at the call site.
+    """
+    try:
+        return AVAILABLE_MODELS[model_name]
+    except KeyError:
+        raise ValueError(f"Unknown model: {model_name}") from None
+
 # =============================================================================
 # OPENAI SETTINGS
 # =============================================================================
 
 OPENAI_TEMPERATURE = 0.7
+OPENAI_MAX_CONCURRENCY = 20  # Max in-flight LLM calls for batch fan-out
 
 # =============================================================================
 # PINECONE SETTINGS
@@ -79,6 +98,36 @@ TAVILY_TOPIC = "general"
 
 MEMORY_BUFFER_SIZE = 10
 MEMORY_RETRIEVAL_K = 5
+MEMORY_UPSERT_BATCH = 128  # Messages buffered per batched Pinecone upsert
+MEMORY_MAX_IN_FLIGHT = 8   # Concurrent background upsert batches
+MEMORY_UPSERT_TOKEN_BUDGET = 8000  # Approx tokens per batched embed request
+MEMORY_QCACHE_THRESHOLD = 0.92  # Min similarity to reuse a cached context
+MEMORY_QCACHE_TTL = 300         # Seconds before a cached context expires
+MEMORY_QCACHE_SIZE = 64         # Max cached (query, context) pairs per session
+
+# On-disk (query, context) cache so restarts don't start cold
+MEMORY_DISK_CACHE_PATH = os.getenv("MEMORY_DISK_CACHE", "nexus_cache.db")
+MEMORY_DISK_CACHE_TTL = 86400  # Seconds before a persisted context expires
+
+# Warm up Pinecone/embeddings clients in a background thread at session
+# creation instead of stalling the first message (set 0 to disable)
+MEMORY_EAGER_INIT = os.getenv("MEMORY_EAGER_INIT", "1") == "1"
+
+# =============================================================================
+# SESSION SETTINGS
+# =============================================================================
+
+SESSION_CACHE_SIZE = 1000  # Max concurrent in-memory sessions
+SESSION_TTL = 3600         # Seconds of inactivity before a session is evicted
+
+# =============================================================================
+# SEMANTIC CACHE SETTINGS
+# =============================================================================
+
+SEMANTIC_CACHE_THRESHOLD = 0.87   # Min cosine similarity for a cache hit
+SEMANTIC_CACHE_TTL = 3600         # Seconds before a cached response expires
+SEMANTIC_CACHE_MAX_ENTRIES = 256  # Max cached responses per session
+EMBED_CACHE_SIZE = 2048           # Max memoized query embeddings per process
 
 # =============================================================================
 # CREATOR INFO (Portfolio)
@@ -90,7 +139,7 @@ GITHUB_URL = "https://github.com/Hemant277123"
 LINKEDIN_URL = "https://www.linkedin.com/in/hemantpandey-f4/"
 EMAIL = ""
 
-CREATOR_SKILLS = [
+CREATOR_SKILLS = (
     "Python",
     "LLM Integration",
     "LangChain",
@@ -99,7 +148,7 @@ CREATOR_SKILLS = [
     "API Development",
     "Full-Stack Development",
     "UI/UX Design"
-]
+)
 
 # =============================================================================
 # PROJECT INFO (About Page)
@@ -112,16 +161,16 @@ LLM integration, real-time web search, semantic memory, and vision AI
 in a professional, Claude-like interface.
 """
 
-PROJECT_FEATURES = [
+PROJECT_FEATURES = (
     {"icon": "⚡", "title": "Streaming Responses", "desc": "Real-time word-by-word text generation"},
     {"icon": "🔍", "title": "Web Search", "desc": "Tavily API for current information"},
     {"icon": "💾", "title": "Semantic Memory", "desc": "Pinecone vector database for context"},
     {"icon": "👁️", "title": "Vision AI", "desc": "Image understanding capability"},
     {"icon": "🔄", "title": "Multi-Model", "desc": "Dynamic model selection"},
     {"icon": "🎨", "title": "Theme Support", "desc": "Light and dark mode"},
-]
+)
 
-TECH_STACK = [
+TECH_STACK = (
     {"name": "OpenAI GPT", "category": "LLM"},
     {"name": "LangChain", "category": "Framework"},
     {"name": "Tavily", "category": "Search"},
@@ -130,12 +179,18 @@ TECH_STACK = [
     {"name": "Next.js", "category": "Frontend"},
     {"name": "React", "category": "UI"},
     {"name": "Python", "category": "Language"},
-]
+)
 
 # =============================================================================
 # SYSTEM PROMPT (For Antigravity-style responses)
 # =============================================================================
 
+# NOTE: keep this a single immutable constant and never interpolate
+# per-request values into it. OpenAI's prompt caching discounts repeated
+# request prefixes, but only when the prefix is byte-identical across
+# calls — any mutation (timestamps, session ids, reordering) breaks the
+# cache and re-bills the full ~500 prompt tokens on every request.
+# Verify hits via usage.prompt_tokens_details.cached_tokens.
 SYSTEM_PROMPT = """You are NexusAI, an AI assistant built by Hemant Pandey.
 
 ## How to Respond:
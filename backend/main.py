@@ -19,6 +19,20 @@ import json
 import asyncio
 import sys
 import os
+import threading
+
+from cachetools import TTLCache
+
+# orjson serializes in C without per-field Python bytecode; the SSE loop
+# below calls dumps once per streamed token, so it adds up
+try:
+    import orjson
+
+    def _dumps(obj: dict) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    def _dumps(obj: dict) -> str:
+        return json.dumps(obj)
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -33,12 +47,22 @@ from config import (
     PROJECT_FEATURES,
     TECH_STACK,
     CREATOR_SKILLS,
+    SESSION_CACHE_SIZE,
+    SESSION_TTL,
+    OPENAI_MAX_CONCURRENCY,
     validate_config
 )
-from agent import create_agent, NexusAgent
+from agent import create_agent, NexusAgent, close_shared_clients
 
 app = FastAPI(title="NexusAI API", version="1.0.0")
 
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Release the shared HTTP connection pools."""
+    await close_shared_clients()
+
+
 # CORS for frontend (allow all origins for production)
 app.add_middleware(
     CORSMiddleware,
@@ -48,10 +72,68 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# In-memory storage for sessions and chats
-sessions: Dict[str, NexusAgent] = {}
+def _finalize_session(agent: "NexusAgent") -> None:
+    """Persist an evicted agent's buffered memory before it's dropped.
+
+    Eviction fires on the request path (often with the sessions lock
+    held), so the flush is handed to the memory's background upsert
+    pool — the submitted write keeps the instance alive until it lands,
+    and the caller never waits on the network.
+    """
+    try:
+        agent.memory.flush(wait=False)
+    except Exception as e:
+        print(f"Error flushing evicted session: {e}")
+
+
+class _SessionCache(TTLCache):
+    """TTL session cache that flushes an agent's memory on eviction.
+
+    Without the finalizer, up to a full upsert batch of buffered,
+    never-flushed messages dies with the agent when a conversation goes
+    idle.
+    """
+
+    def popitem(self):
+        key, agent = super().popitem()
+        _finalize_session(agent)
+        return key, agent
+
+    def expire(self, time=None):
+        # expire() only returns the removed pairs from cachetools 5.5.0
+        # (older versions return None); guard so a stray older install
+        # degrades to missing the flush instead of raising
+        expired = super().expire(time) or ()
+        for _, agent in expired:
+            _finalize_session(agent)
+        return expired
+
+
+# In-memory storage for sessions and chats. Sessions are bounded with
+# TTL eviction so idle agents (history, LLM handles, memory) don't
+# accumulate until the process OOMs.
+sessions: TTLCache = _SessionCache(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_TTL)
+_sessions_lock = threading.Lock()
 chats: Dict[str, Dict] = {}
 
+# Bound concurrent LLM calls on fan-out paths
+_llm_semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+
+
+def get_session_agent(session_id: str, model: str) -> NexusAgent:
+    """Get or create the agent for a session (refreshes its TTL)."""
+    with _sessions_lock:
+        agent = sessions.get(session_id)
+        if agent is None:
+            agent = create_agent(session_id=session_id, model_name=model)
+        sessions[session_id] = agent
+
+    # Change model if different
+    if agent.model_name != model:
+        agent.change_model(model)
+
+    return agent
+
 # =============================================================================
 # MODELS
 # =============================================================================
@@ -62,6 +144,11 @@ class ChatRequest(BaseModel):
     model: str = DEFAULT_MODEL
     chat_id: Optional[str] = None
 
+class BatchChatRequest(BaseModel):
+    messages: List[str]
+    session_id: str
+    model: str = DEFAULT_MODEL
+
 class ChatMessage(BaseModel):
     role: str
     content: str
@@ -95,7 +182,7 @@ async def get_config():
         validate_config()
         return {
             "valid": True,
-            "models": AVAILABLE_MODELS,
+            "models": dict(AVAILABLE_MODELS),
             "default_model": DEFAULT_MODEL,
             "creator": {
                 "name": CREATOR_NAME,
@@ -116,21 +203,10 @@ async def get_config():
 async def chat(request: ChatRequest):
     """Send a message and get a response."""
     try:
-        # Get or create session
-        if request.session_id not in sessions:
-            sessions[request.session_id] = create_agent(
-                session_id=request.session_id,
-                model_name=request.model
-            )
-        
-        agent = sessions[request.session_id]
-        
-        # Change model if different
-        if agent.model_name != request.model:
-            agent.change_model(request.model)
-        
+        agent = get_session_agent(request.session_id, request.model)
+
         # Get response
-        response = agent.chat(request.message)
+        response = await agent.chat(request.message)
         
         return {
             "success": True,
@@ -140,30 +216,44 @@ async def chat(request: ChatRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/chat/batch")
+async def chat_batch(request: BatchChatRequest):
+    """Answer several independent messages concurrently.
+
+    Calls fan out with asyncio.gather so M messages cost roughly one
+    LLM latency instead of M; the semaphore keeps in-flight requests
+    inside OpenAI's rate limit. Each call prompts against a history
+    snapshot taken up front, so concurrent completions can't interleave
+    writes into the shared chat history.
+    """
+    try:
+        agent = get_session_agent(request.session_id, request.model)
+        snapshot = list(agent.chat_history)
+
+        async def one(message: str) -> str:
+            async with _llm_semaphore:
+                return await agent.chat(message, history=snapshot)
+
+        responses = await asyncio.gather(*(one(m) for m in request.messages))
+        return {"success": True, "responses": list(responses)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/chat/stream")
 async def chat_stream(request: ChatRequest):
     """Stream a chat response."""
     try:
-        # Get or create session
-        if request.session_id not in sessions:
-            sessions[request.session_id] = create_agent(
-                session_id=request.session_id,
-                model_name=request.model
-            )
-        
-        agent = sessions[request.session_id]
-        
-        if agent.model_name != request.model:
-            agent.change_model(request.model)
-        
+        agent = get_session_agent(request.session_id, request.model)
+
         async def generate():
             try:
-                for chunk in agent.chat_stream(request.message):
-                    yield f"data: {json.dumps({'chunk': chunk})}\n\n"
-                    await asyncio.sleep(0.01)
-                yield f"data: {json.dumps({'done': True, 'search_used': agent.was_search_used()})}\n\n"
+                # No artificial pacing — TCP backpressure handles the
+                # client side, and async for already yields the loop
+                async for chunk in agent.chat_stream(request.message):
+                    yield f"data: {_dumps({'chunk': chunk})}\n\n"
+                yield f"data: {_dumps({'done': True, 'search_used': agent.was_search_used()})}\n\n"
             except Exception as e:
-                yield f"data: {json.dumps({'error': str(e)})}\n\n"
+                yield f"data: {_dumps({'error': str(e)})}\n\n"
         
         return StreamingResponse(
             generate(),
@@ -185,19 +275,10 @@ async def chat_with_image(
 ):
     """Send a message with an image."""
     try:
-        if session_id not in sessions:
-            sessions[session_id] = create_agent(
-                session_id=session_id,
-                model_name=model
-            )
-        
-        agent = sessions[session_id]
-        
-        if agent.model_name != model:
-            agent.change_model(model)
-        
+        agent = get_session_agent(session_id, model)
+
         image_bytes = await image.read()
-        response = agent.chat(message, image_bytes=image_bytes)
+        response = await agent.chat(message, image_bytes=image_bytes)
         
         return {
             "success": True,
@@ -255,8 +336,10 @@ async def delete_chat(chat_id: str):
 @app.post("/api/session/clear")
 async def clear_session(session_id: str):
     """Clear a session's agent memory."""
-    if session_id in sessions:
-        sessions[session_id].clear_history()
+    with _sessions_lock:
+        agent = sessions.get(session_id)
+    if agent is not None:
+        agent.clear_history()
     return {"success": True}
 
 if __name__ == "__main__":
@@ -10,10 +10,21 @@ This module handles:
 Reference: https://docs.pinecone.io/guides/get-started/quickstart
 """
 
+import asyncio
+import atexit
+import functools
+import hashlib
 import os
+import sqlite3
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, wait as futures_wait
 from datetime import datetime
 from typing import List, Dict, Optional
-import hashlib
+import uuid
+
+import numpy as np
 
 from config import (
     PINECONE_API_KEY,
@@ -23,10 +34,179 @@ from config import (
     PINECONE_CLOUD,
     PINECONE_REGION,
     OPENAI_API_KEY,
-    MEMORY_RETRIEVAL_K
+    MEMORY_RETRIEVAL_K,
+    MEMORY_UPSERT_BATCH,
+    MEMORY_QCACHE_THRESHOLD,
+    MEMORY_QCACHE_TTL,
+    MEMORY_QCACHE_SIZE,
+    MEMORY_EAGER_INIT,
+    MEMORY_MAX_IN_FLIGHT,
+    MEMORY_UPSERT_TOKEN_BUDGET,
+    MEMORY_DISK_CACHE_PATH,
+    MEMORY_DISK_CACHE_TTL
 )
 
 
+# Display labels for memory roles (anything unknown reads as Assistant)
+ROLE_LABEL = {"user": "User"}
+
+# Cached index host — describe_index is a control-plane RPC; resolve the
+# data-plane host once per process instead of per client
+_INDEX_HOST: Optional[str] = None
+
+# Process-wide handles. The Pinecone client, index handle, embeddings
+# client and vector store are all session-independent, so every session
+# shares one set instead of repeating TLS handshakes and client
+# construction (each O(100ms)) per NexusMemory.
+_SHARED_LOCK = threading.Lock()
+_PC = None
+_INDEX = None
+_EMBED = None
+_VECTOR_STORE = None
+
+# Shared pool for background batch upserts — Pinecone is thread-safe,
+# so the next batch can be assembled while the previous one is in flight
+_UPSERT_EXECUTOR = ThreadPoolExecutor(
+    max_workers=MEMORY_MAX_IN_FLIGHT, thread_name_prefix="memory-upsert"
+)
+
+# Live instances tracked weakly for the shutdown flush — a weak set so
+# session eviction can actually free a memory and its local vector store
+# (an atexit-registered bound method would pin every instance for the
+# life of the process)
+_LIVE_MEMORIES: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def _flush_all_at_exit():
+    """Flush every live memory's buffered messages at interpreter exit.
+
+    atexit handlers run after threading has finalized the upsert pool,
+    so each memory writes its remaining buffer synchronously on this
+    thread — submitting to the executor here would raise and drop the
+    batch. In-flight batches were already joined by the pool shutdown.
+    """
+    for mem in list(_LIVE_MEMORIES):
+        try:
+            mem._flush_sync()
+        except Exception:
+            pass
+
+
+atexit.register(_flush_all_at_exit)
+
+# On-disk (query, context) cache shared by all sessions in this process,
+# so a restart doesn't begin with a cold cache
+_DISK_CACHE_LOCK = threading.Lock()
+_DISK_CACHE: Optional[sqlite3.Connection] = None
+
+
+def _disk_cache() -> sqlite3.Connection:
+    """Open (or return) the persistent context cache database."""
+    global _DISK_CACHE
+    with _DISK_CACHE_LOCK:
+        if _DISK_CACHE is None:
+            conn = sqlite3.connect(MEMORY_DISK_CACHE_PATH, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS context_cache "
+                "(qhash TEXT PRIMARY KEY, session TEXT, query TEXT, ctx TEXT, ts REAL)"
+            )
+            # Prune rows past their TTL and reclaim the space, so the
+            # database doesn't grow without bound across restarts
+            conn.execute(
+                "DELETE FROM context_cache WHERE ts < ?",
+                (time.time() - MEMORY_DISK_CACHE_TTL,)
+            )
+            conn.commit()
+            conn.execute("VACUUM")
+            _DISK_CACHE = conn
+    return _DISK_CACHE
+
+
+@functools.lru_cache(maxsize=1)
+def _lazy_imports():
+    """
+    Resolve the heavy third-party imports once.
+
+    pinecone/langchain pull in megabytes of transitive modules, so they
+    stay out of module import time (cold starts that never touch memory
+    don't pay for them) and the cache means repeat initialization never
+    re-resolves them.
+    """
+    from pinecone import ServerlessSpec
+    from langchain_openai import OpenAIEmbeddings
+    from langchain_pinecone import PineconeVectorStore
+    try:
+        # gRPC data plane: multiplexed HTTP/2, so concurrent
+        # upserts/queries don't serialize on one connection
+        from pinecone.grpc import PineconeGRPC as Pinecone
+    except ImportError:
+        from pinecone import Pinecone
+
+    return Pinecone, ServerlessSpec, OpenAIEmbeddings, PineconeVectorStore
+
+
+def _init_shared():
+    """
+    Build (or return) the shared Pinecone and embeddings handles.
+
+    Raises on failure so callers can record it; thread-safe.
+    """
+    global _PC, _INDEX, _EMBED, _VECTOR_STORE, _INDEX_HOST
+
+    with _SHARED_LOCK:
+        if _VECTOR_STORE is not None:
+            return _PC, _INDEX, _EMBED, _VECTOR_STORE
+
+        Pinecone, ServerlessSpec, OpenAIEmbeddings, PineconeVectorStore = _lazy_imports()
+
+        pc = Pinecone(api_key=PINECONE_API_KEY)
+
+        # Check if index exists, create if not — a single existence RPC
+        # instead of listing and materializing every index name. Older
+        # SDKs lack has_index; there, short-circuit membership without
+        # building an intermediate list
+        has_index = getattr(pc, "has_index", None)
+        if has_index is not None:
+            index_exists = has_index(PINECONE_INDEX_NAME)
+        else:
+            index_exists = any(
+                idx.name == PINECONE_INDEX_NAME for idx in pc.list_indexes()
+            )
+
+        if not index_exists:
+            print(f"Creating Pinecone index: {PINECONE_INDEX_NAME}")
+            pc.create_index(
+                name=PINECONE_INDEX_NAME,
+                dimension=PINECONE_DIMENSION,
+                metric=PINECONE_METRIC,
+                spec=ServerlessSpec(
+                    cloud=PINECONE_CLOUD,
+                    region=PINECONE_REGION
+                )
+            )
+            print(f"Index '{PINECONE_INDEX_NAME}' created successfully!")
+
+        # Connect to the index by cached host, skipping the
+        # describe_index RPC that targeting by name performs
+        if _INDEX_HOST is None:
+            _INDEX_HOST = pc.describe_index(PINECONE_INDEX_NAME).host
+        index = pc.Index(host=_INDEX_HOST)
+
+        embeddings = OpenAIEmbeddings(
+            openai_api_key=OPENAI_API_KEY,
+            model="text-embedding-3-small"
+        )
+
+        vector_store = PineconeVectorStore(
+            index=index,
+            embedding=embeddings,
+            text_key="text"
+        )
+
+        _PC, _INDEX, _EMBED, _VECTOR_STORE = pc, index, embeddings, vector_store
+        return _PC, _INDEX, _EMBED, _VECTOR_STORE
+
+
 class NexusMemory:
     """
     Vector-based semantic memory for NexusAI.
@@ -52,6 +232,36 @@ class NexusMemory:
         self._initialized = False
         self._initialization_failed = False
         self._error_message = None
+        # Local hot path: this session's vectors kept in-process so
+        # retrieval is a SIMD dot product instead of a Pinecone RPC.
+        # _hydrated means the namespace's persisted vectors have been
+        # pulled in, so local results cover the whole session history.
+        self._local_vecs: List[np.ndarray] = []
+        self._local_entries: List[Dict] = []
+        self._local_ids: set = set()
+        self._hydrated = False
+        # Pending upsert buffers: messages are embedded and written in
+        # batches so N messages cost one round trip, not N. Guarded by
+        # a lock — concurrent adds/flushes (batch fan-out, upsert pool)
+        # must not interleave the capture-then-reset in flush or desync
+        # the parallel buffer lists
+        self._buffer_lock = threading.Lock()
+        self._batch_size = MEMORY_UPSERT_BATCH
+        self._pending_texts: List[str] = []
+        self._pending_meta: List[Dict] = []
+        self._pending_ids: List[str] = []
+        self._pending_tokens = 0
+        self._inflight: List = []
+        _LIVE_MEMORIES.add(self)
+        # Query cache: recent (query embedding, formatted context, ts)
+        # entries so paraphrased queries skip the search entirely
+        self._qcache: List[tuple] = []
+        # Pre-warm the Pinecone/embeddings clients off the request path;
+        # the first message either finds everything ready or briefly
+        # blocks on the init lock while warmup finishes
+        self._init_lock = threading.Lock()
+        if MEMORY_EAGER_INIT:
+            threading.Thread(target=self.initialize, daemon=True).start()
         
     def initialize(self) -> bool:
         """
@@ -61,67 +271,118 @@ class NexusMemory:
         Returns:
             bool: True if initialization successful
         """
-        # Don't retry if we already failed
-        if self._initialization_failed:
+        # Serialized under a lock so the eager warmup thread and the
+        # first request don't race; late callers just wait for warmup
+        with self._init_lock:
+            # Don't retry if we already failed
+            if self._initialization_failed:
+                return False
+
+            if self._initialized:
+                return True
+
+            try:
+                # Bind the shared process-wide handles — the heavy work
+                # happens at most once per process
+                self.pc, self.index, self.embeddings, self.vector_store = _init_shared()
+                self._initialized = True
+                return True
+
+            except Exception as e:
+                self._initialization_failed = True
+                self._error_message = str(e)
+                print(f"Error initializing memory: {e}")
+                return False
+    
+    def _local_add(self, vec: List[float], meta: Dict, vec_id: Optional[str] = None):
+        """Add a normalized vector to this session's in-process store."""
+        v = np.asarray(vec, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        if norm > 0:
+            v /= norm
+        # Appends happen under the lock so the vector and entry lists
+        # stay index-aligned when upsert workers land concurrently
+        with self._buffer_lock:
+            if vec_id is not None:
+                if vec_id in self._local_ids:
+                    return
+                self._local_ids.add(vec_id)
+            # Stored as FP16 — halves resident memory per vector; recall
+            # loss is negligible for normalized conversational embeddings
+            self._local_vecs.append(v.astype(np.float16))
+            self._local_entries.append(meta)
+
+    def _local_search(self, query_vec: List[float], k: int) -> List[Dict]:
+        """
+        Exact inner-product search over this session's local vectors.
+
+        Vectors are normalized, so inner product equals cosine
+        similarity — same ranking Pinecone would return, without the
+        network round trip.
+        """
+        q = np.asarray(query_vec, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm > 0:
+            q /= norm
+
+        # Upcast the FP16 store for the dot product — FP32 matmul is the
+        # fast SIMD path and the copy is small at per-session sizes
+        matrix = np.stack(self._local_vecs).astype(np.float32)
+        scores = matrix @ q
+        top = np.argsort(-scores)[:k]
+
+        return [
+            {
+                "content": self._local_entries[i].get("text", ""),
+                "role": self._local_entries[i].get("role", "unknown"),
+                "timestamp": self._local_entries[i].get("timestamp", ""),
+                "score": float(scores[i])
+            }
+            for i in top
+        ]
+
+    def _hydrate_local(self) -> bool:
+        """
+        Pull this session's persisted vectors into the local store.
+
+        Runs once per session per process, so a conversation resumed
+        after a restart has its whole history on the local hot path —
+        not just the messages flushed since the restart. Vectors already
+        added by recent flushes are skipped by id.
+
+        Returns:
+            bool: True if the namespace is fully mirrored locally
+        """
+        if not hasattr(self.index, "list"):
+            # Older SDK without id listing — callers keep querying the
+            # namespace directly instead
             return False
-            
-        if self._initialized:
-            return True
-            
+
         try:
-            from pinecone import Pinecone, ServerlessSpec
-            from langchain_openai import OpenAIEmbeddings
-            from langchain_pinecone import PineconeVectorStore
-            
-            # Initialize Pinecone client
-            self.pc = Pinecone(api_key=PINECONE_API_KEY)
-            
-            # Check if index exists, create if not
-            existing_indexes = [idx.name for idx in self.pc.list_indexes()]
-            
-            if PINECONE_INDEX_NAME not in existing_indexes:
-                print(f"Creating Pinecone index: {PINECONE_INDEX_NAME}")
-                self.pc.create_index(
-                    name=PINECONE_INDEX_NAME,
-                    dimension=PINECONE_DIMENSION,
-                    metric=PINECONE_METRIC,
-                    spec=ServerlessSpec(
-                        cloud=PINECONE_CLOUD,
-                        region=PINECONE_REGION
-                    )
+            ids: List[str] = []
+            for page in self.index.list(namespace=self.session_id):
+                ids.extend(page)
+            ids = [i for i in ids if i not in self._local_ids]
+
+            for start in range(0, len(ids), 100):
+                fetched = self.index.fetch(
+                    ids=ids[start:start + 100], namespace=self.session_id
                 )
-                print(f"Index '{PINECONE_INDEX_NAME}' created successfully!")
-            
-            # Connect to the index
-            self.index = self.pc.Index(PINECONE_INDEX_NAME)
-            
-            # Initialize OpenAI embeddings
-            self.embeddings = OpenAIEmbeddings(
-                openai_api_key=OPENAI_API_KEY,
-                model="text-embedding-3-small"
-            )
-            
-            # Initialize vector store
-            self.vector_store = PineconeVectorStore(
-                index=self.index,
-                embedding=self.embeddings,
-                text_key="text"
-            )
-            
-            self._initialized = True
+                for vec_id, vec in fetched.vectors.items():
+                    self._local_add(
+                        list(vec.values), dict(vec.metadata or {}), vec_id=vec_id
+                    )
             return True
-            
+
         except Exception as e:
-            self._initialization_failed = True
-            self._error_message = str(e)
-            print(f"Error initializing memory: {e}")
+            print(f"Error hydrating local memory: {e}")
             return False
-    
-    def _generate_id(self, text: str, role: str) -> str:
+
+    def _generate_id(self) -> str:
         """Generate a unique ID for a memory entry."""
-        timestamp = datetime.now().isoformat()
-        content = f"{self.session_id}_{role}_{timestamp}_{text[:50]}"
-        return hashlib.md5(content.encode()).hexdigest()
+        # uuid4 is already collision-safe — no need to build and hash a
+        # session/role/timestamp string per message
+        return uuid.uuid4().hex
     
     def add_message(self, role: str, content: str, metadata: Optional[Dict] = None) -> bool:
         """
@@ -144,38 +405,157 @@ class NexusMemory:
                 return False
         
         try:
-            # Prepare metadata
+            # One datetime allocation + ISO format per message
+            timestamp = datetime.now().isoformat()
+
+            # Prepare metadata. The text itself is attached once at
+            # flush time (retrieval reads it via text_key), and the
+            # session is identified by the namespace — no duplicated
+            # fields inflating the upsert payload
             msg_metadata = {
-                "session_id": self.session_id,
                 "role": role,
-                "timestamp": datetime.now().isoformat(),
-                "text": content
+                "timestamp": timestamp
             }
             
             if metadata:
                 msg_metadata.update(metadata)
-            
-            # Add to vector store
-            self.vector_store.add_texts(
-                texts=[content],
-                metadatas=[msg_metadata],
-                ids=[self._generate_id(content, role)]
-            )
-            
+
+            # Buffer and flush in batches — one embedding request and
+            # one upsert round trip per batch instead of per message
+            with self._buffer_lock:
+                self._pending_texts.append(content)
+                self._pending_meta.append(msg_metadata)
+                self._pending_ids.append(self._generate_id())
+                # ~4 chars per token — keeps each embed request under the
+                # provider's per-request budget regardless of message length
+                self._pending_tokens += len(content) // 4 + 1
+                should_flush = (len(self._pending_texts) >= self._batch_size
+                                or self._pending_tokens >= MEMORY_UPSERT_TOKEN_BUDGET)
+
+            if should_flush:
+                return self.flush()
+
             return True
-            
+
         except Exception as e:
             print(f"Error adding message to memory: {e}")
             return False
+
+    def add_messages(self, messages: List[Dict]) -> bool:
+        """
+        Bulk-ingest messages and flush them in one batch.
+
+        Args:
+            messages: Dicts with "role", "content" and optional "metadata"
+
+        Returns:
+            bool: True if all messages were stored
+        """
+        ok = True
+        for msg in messages:
+            ok = self.add_message(msg["role"], msg["content"], msg.get("metadata")) and ok
+        return self.flush(wait=True) and ok
+
+    def flush(self, wait: bool = False) -> bool:
+        """
+        Write all buffered messages to Pinecone in one batched upsert.
+
+        The write runs on a background thread so the caller isn't
+        blocked on the Pinecone round trip; pass wait=True when the
+        result must be visible before continuing (searches, shutdown).
+
+        Args:
+            wait: Block until all in-flight batches have landed
+
+        Returns:
+            bool: True if nothing failed (only meaningful with wait=True)
+        """
+        # Capture-then-reset must be atomic — two concurrent flushes
+        # otherwise submit the same batch twice or drop the token counter
+        with self._buffer_lock:
+            # Reap finished uploads so the in-flight list stays small
+            self._inflight = [f for f in self._inflight if not f.done()]
+
+            if self._pending_texts:
+                texts = self._pending_texts
+                metas = self._pending_meta
+                ids = self._pending_ids
+                self._pending_texts, self._pending_meta, self._pending_ids = [], [], []
+                self._pending_tokens = 0
+                self._inflight.append(
+                    _UPSERT_EXECUTOR.submit(self._write_batch, texts, metas, ids)
+                )
+
+            inflight = list(self._inflight)
+
+        if wait and inflight:
+            done, _ = futures_wait(inflight)
+            with self._buffer_lock:
+                self._inflight = [f for f in self._inflight if not f.done()]
+            return all(f.result() for f in done)
+
+        return True
+
+    def _flush_sync(self) -> bool:
+        """Write any buffered messages on the calling thread.
+
+        Used by the atexit hook, where the upsert pool no longer accepts
+        work; everywhere else prefer flush(), which keeps the write off
+        the caller's thread.
+        """
+        with self._buffer_lock:
+            texts = self._pending_texts
+            metas = self._pending_meta
+            ids = self._pending_ids
+            self._pending_texts, self._pending_meta, self._pending_ids = [], [], []
+            self._pending_tokens = 0
+
+        if not texts:
+            return True
+        return self._write_batch(texts, metas, ids)
+
+    def _write_batch(self, texts: List[str], metas: List[Dict], ids: List[str]) -> bool:
+        """Embed and upsert one batch (runs on the upsert pool)."""
+        try:
+            # Attach the stored text exactly once, under the key the
+            # vector store reads back on retrieval
+            for meta, text in zip(metas, texts):
+                meta["text"] = text
+
+            # Embed the whole batch once; reuse the vectors for Pinecone
+            # (durable store) and the local hot path
+            vecs = self.embeddings.embed_documents(texts)
+            self.index.upsert(
+                vectors=[
+                    {"id": ids[i], "values": vecs[i], "metadata": metas[i]}
+                    for i in range(len(texts))
+                ],
+                namespace=self.session_id
+            )
+            for i in range(len(texts)):
+                self._local_add(vecs[i], metas[i], vec_id=ids[i])
+            return True
+
+        except Exception as e:
+            print(f"Error flushing memory batch: {e}")
+            return False
     
-    def search_memory(self, query: str, k: int = None) -> List[Dict]:
+    def search_memory(
+        self,
+        query: str,
+        k: int = None,
+        query_vector: Optional[np.ndarray] = None
+    ) -> List[Dict]:
         """
         Search memory for relevant past conversations.
-        
+
         Args:
             query: The search query
             k: Number of results to return
-            
+            query_vector: Optional precomputed query embedding — pass it
+                when the caller already embedded the query so the string
+                isn't embedded a second time
+
         Returns:
             List of relevant memory entries with metadata
         """
@@ -188,13 +568,35 @@ class NexusMemory:
                 return []
         
         k = k or MEMORY_RETRIEVAL_K
-        
+
+        # Make buffered messages visible before searching
+        self.flush(wait=True)
+
         try:
-            # Perform similarity search
-            results = self.vector_store.similarity_search_with_score(
-                query=query,
+            # Embed once (unless the caller already did)
+            if query_vector is None:
+                query_vector = self._embed_query(query)
+            if query_vector is None:
+                return []
+
+            # Hot path: exact local search over this session's vectors
+            # (tens of microseconds, no network) — taken only once the
+            # persisted namespace has been mirrored locally, so a resumed
+            # session never searches a partial history
+            if not self._hydrated:
+                self._hydrated = self._hydrate_local()
+            if self._hydrated:
+                return self._local_search(query_vector, k) if self._local_vecs else []
+
+            # Fallback: hydration unavailable (older SDK or transient
+            # error) — search the namespace by vector so the query isn't
+            # re-embedded. The per-session namespace bounds the scan to
+            # this session's vectors instead of post-filtering the whole
+            # index.
+            results = self.vector_store.similarity_search_by_vector_with_score(
+                embedding=query_vector.tolist(),
                 k=k,
-                filter={"session_id": self.session_id}
+                namespace=self.session_id
             )
             
             memories = []
@@ -212,31 +614,194 @@ class NexusMemory:
             print(f"Error searching memory: {e}")
             return []
     
-    def get_relevant_context(self, query: str) -> str:
+    def get_relevant_context(
+        self, query: str, query_vector: Optional[np.ndarray] = None
+    ) -> str:
         """
         Get formatted context from memory for the agent.
-        
+
         Args:
             query: The current user query
-            
+            query_vector: Optional precomputed normalized embedding —
+                pass it when the caller already embedded the query (the
+                agent shares the semantic cache's vector) so one
+                embedding RPC serves both subsystems
+
         Returns:
             Formatted string with relevant past context
         """
         # Return empty if memory is not working (don't block the agent)
         if self._initialization_failed:
             return ""
-            
-        memories = self.search_memory(query)
-        
+
+        # The on-disk cache is day-scale stale, so it's a warm-start
+        # layer only: consulted while this process has no in-memory
+        # state for the session, never inside a live conversation
+        if not self._qcache and not self._local_vecs:
+            cached = self._disk_cache_get(query)
+            if cached is not None:
+                return cached
+
+        # Embed the query once (unless the caller already did); a close
+        # paraphrase of a recent query reuses its formatted context
+        # without another search
+        query_vec = query_vector if query_vector is not None else self._embed_query(query)
+        if query_vec is not None:
+            cached = self._qcache_get(query_vec)
+            if cached is not None:
+                return cached
+
+        memories = self.search_memory(query, query_vector=query_vec)
+        return self._finish_context(query, query_vec, memories)
+
+    async def a_add_message(self, role: str, content: str, metadata: Optional[Dict] = None) -> bool:
+        """Async add_message — offloads any triggered flush to a thread."""
+        return await asyncio.to_thread(self.add_message, role, content, metadata)
+
+    async def a_search_memory(
+        self,
+        query: str,
+        k: int = None,
+        query_vector: Optional[np.ndarray] = None
+    ) -> List[Dict]:
+        """Async search_memory — embeds without blocking the event loop."""
+        if query_vector is None:
+            query_vector = await self._a_embed_query(query)
+        return await asyncio.to_thread(self.search_memory, query, k, query_vector)
+
+    async def a_get_relevant_context(
+        self, query: str, query_vector: Optional[np.ndarray] = None
+    ) -> str:
+        """
+        Async get_relevant_context.
+
+        The embedding call uses the provider's async client and the
+        Pinecone search runs on a thread, so concurrent sessions overlap
+        their I/O instead of serializing on one worker. Accepts a
+        precomputed query embedding like the sync version.
+        """
+        if self._initialization_failed:
+            return ""
+
+        # Warm-start layer only — see get_relevant_context
+        if not self._qcache and not self._local_vecs:
+            cached = self._disk_cache_get(query)
+            if cached is not None:
+                return cached
+
+        query_vec = query_vector if query_vector is not None else await self._a_embed_query(query)
+        if query_vec is not None:
+            cached = self._qcache_get(query_vec)
+            if cached is not None:
+                return cached
+
+        memories = await self.a_search_memory(query, query_vector=query_vec)
+        return self._finish_context(query, query_vec, memories)
+
+    def _disk_cache_key(self, query: str) -> str:
+        """Hash key for the persistent cache, namespaced by session."""
+        raw = f"{self.session_id}\x00{query.strip().lower()}"
+        return hashlib.blake2b(raw.encode()).hexdigest()
+
+    def _disk_cache_get(self, query: str) -> Optional[str]:
+        """Return a persisted context for this exact query, if fresh."""
+        try:
+            conn = _disk_cache()
+            with _DISK_CACHE_LOCK:
+                row = conn.execute(
+                    "SELECT ctx, ts FROM context_cache WHERE qhash = ?",
+                    (self._disk_cache_key(query),)
+                ).fetchone()
+            if row and time.time() - row[1] < MEMORY_DISK_CACHE_TTL:
+                return row[0]
+        except Exception as e:
+            print(f"Error reading context cache: {e}")
+        return None
+
+    def _disk_cache_put(self, query: str, context: str):
+        """Persist a (query, context) pair for reuse across restarts."""
+        try:
+            conn = _disk_cache()
+            with _DISK_CACHE_LOCK:
+                conn.execute(
+                    "INSERT OR REPLACE INTO context_cache VALUES (?, ?, ?, ?, ?)",
+                    (self._disk_cache_key(query), self.session_id, query, context, time.time())
+                )
+                conn.commit()
+        except Exception as e:
+            print(f"Error writing context cache: {e}")
+
+    def _finish_context(
+        self,
+        query: str,
+        query_vec: Optional[np.ndarray],
+        memories: List[Dict]
+    ) -> str:
+        """Format retrieved memories and record them in the caches."""
         if not memories:
             return ""
-        
+
+        # Single pass, one string per memory — no intermediate lists or
+        # per-entry branching
         context_parts = ["Relevant past conversations:"]
-        for mem in memories:
-            role = "User" if mem["role"] == "user" else "Assistant"
-            context_parts.append(f"- {role}: {mem['content'][:200]}...")
-        
-        return "\n".join(context_parts)
+        context_parts.extend(
+            f"- {ROLE_LABEL.get(mem['role'], 'Assistant')}: {mem['content'][:200]}..."
+            for mem in memories
+        )
+        context = "\n".join(context_parts)
+
+        if query_vec is not None:
+            self._qcache.append((query_vec, context, time.time()))
+            if len(self._qcache) > MEMORY_QCACHE_SIZE:
+                self._qcache = self._qcache[-MEMORY_QCACHE_SIZE:]
+
+        self._disk_cache_put(query, context)
+
+        return context
+
+    async def _a_embed_query(self, query: str) -> Optional[np.ndarray]:
+        """Async counterpart of _embed_query."""
+        if not self._initialized:
+            if not await asyncio.to_thread(self.initialize):
+                return None
+        try:
+            vec = np.asarray(await self.embeddings.aembed_query(query), dtype=np.float32)
+            norm = np.linalg.norm(vec)
+            if norm > 0:
+                vec /= norm
+            return vec
+        except Exception as e:
+            print(f"Error embedding query: {e}")
+            return None
+
+    def _embed_query(self, query: str) -> Optional[np.ndarray]:
+        """Embed a query to a normalized vector, or None on failure."""
+        if not self._initialized:
+            if not self.initialize():
+                return None
+        try:
+            vec = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+            norm = np.linalg.norm(vec)
+            if norm > 0:
+                vec /= norm
+            return vec
+        except Exception as e:
+            print(f"Error embedding query: {e}")
+            return None
+
+    def _qcache_get(self, query_vec: np.ndarray) -> Optional[str]:
+        """Return a cached context for a near-identical query, if any."""
+        now = time.time()
+        self._qcache = [e for e in self._qcache if now - e[2] < MEMORY_QCACHE_TTL]
+        if not self._qcache:
+            return None
+
+        matrix = np.stack([e[0] for e in self._qcache])
+        scores = matrix @ query_vec
+        best = int(np.argmax(scores))
+        if scores[best] >= MEMORY_QCACHE_THRESHOLD:
+            return self._qcache[best][1]
+        return None
     
     def clear_session(self) -> bool:
         """
@@ -245,19 +810,64 @@ class NexusMemory:
         Returns:
             bool: True if successful
         """
+        # Discard buffered messages and drain in-flight upsert batches
+        # first — a batch landing after the delete would resurrect
+        # "cleared" messages in Pinecone and on the local hot path
+        with self._buffer_lock:
+            self._pending_texts, self._pending_meta, self._pending_ids = [], [], []
+            self._pending_tokens = 0
+            inflight = self._inflight
+            self._inflight = []
+        if inflight:
+            futures_wait(inflight)
+
+        # Then drop per-session state so no stale context can be served
+        with self._buffer_lock:
+            self._local_vecs = []
+            self._local_entries = []
+            self._local_ids = set()
+            self._qcache = []
+
+        try:
+            conn = _disk_cache()
+            with _DISK_CACHE_LOCK:
+                conn.execute(
+                    "DELETE FROM context_cache WHERE session = ?",
+                    (self.session_id,)
+                )
+                conn.commit()
+        except Exception as e:
+            print(f"Error clearing context cache: {e}")
+
         if not self._initialized:
             return True
-        
+
         try:
+            # Namespaced bulk delete: one RPC removes every vector this
+            # session ever stored
+            self.index.delete(delete_all=True, namespace=self.session_id)
             print(f"Session {self.session_id} cleared from memory.")
             return True
-            
+
         except Exception as e:
             print(f"Error clearing session: {e}")
             return False
 
 
 # Convenience function for quick memory access
+@functools.lru_cache(maxsize=1024)
 def get_memory(session_id: str = "default") -> NexusMemory:
-    """Get a memory instance for the given session (lazy initialization)."""
+    """
+    Get the memory instance for a session.
+
+    Memoized so repeated calls for the same session share one instance —
+    and therefore its buffers, query cache, and local vector store —
+    instead of rebuilding them per request. Bounded, so the oldest
+    entries fall out once 1024 sessions are live.
+    """
     return NexusMemory(session_id=session_id)
+
+
+def evict_memory():
+    """Drop the memoized memory instances (e.g. after clearing sessions)."""
+    get_memory.cache_clear()